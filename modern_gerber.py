@@ -5,19 +5,215 @@ Replaces the plex-based parser with a simpler regex-based approach
 """
 
 import re
+import os
+import ast
 import math
+import mmap
+import operator
 import sys
+from array import array
+from functools import lru_cache
 from reportlab.lib.units import mm, inch
 from reportlab.lib import colors
+from reportlab.pdfgen.canvas import FILL_NON_ZERO
+
+# Macro expression closures keyed by (expression, parameter count)
+_EXPR_CACHE = {}
+
+# $N parameter references, and a translate table deleting every character a
+# macro expression may contain - anything left over is not basic math
+_PARAM_RE = re.compile(r'\$(\d+)')
+_STRIP_ALLOWED = str.maketrans('', '', '0123456789+-*/.() $')
+
+# Exact (cos, sin) at multiples of 45 degrees over the range arc angles can take.
+# Arcs between axis-aligned points start and step on these exactly, so they skip
+# libm and get clean 0/1 values instead of 6e-17.
+_OCTANT_TRIG = {
+    n * math.pi / 4: ((1.0, 0.5 ** 0.5, 0.0, -0.5 ** 0.5, -1.0, -0.5 ** 0.5, 0.0, 0.5 ** 0.5)[n % 8],
+                      (0.0, 0.5 ** 0.5, 1.0, 0.5 ** 0.5, 0.0, -0.5 ** 0.5, -1.0, -0.5 ** 0.5)[n % 8])
+    for n in range(-12, 13)
+}
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+def _expression_closure(node, param_count):
+    """Build a closure p -> value from a parsed arithmetic expression.
+    
+    $N has been rewritten to the name _pN and reads p[N-1]. With a param_count,
+    references beyond it read 0, like missing aperture parameters.
+    """
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda p: value
+    if isinstance(node, ast.Name) and node.id[2:].isdigit():
+        index = int(node.id[2:]) - 1
+        if param_count is not None and index >= param_count:
+            return lambda p: 0
+        return lambda p: p[index]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left = _expression_closure(node.left, param_count)
+        right = _expression_closure(node.right, param_count)
+        return lambda p: op(left(p), right(p))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = _expression_closure(node.operand, param_count)
+        return lambda p: op(operand(p))
+    raise ValueError(f"Unsupported macro expression element: {ast.dump(node)}")
+
+def _macro_expression(expr, param_count=None):
+    """Closure evaluating the macro expression expr against a parameter list,
+    or None if it is not plain arithmetic on numbers and $N references"""
+    key = (expr, param_count)
+    try:
+        return _EXPR_CACHE[key]
+    except KeyError:
+        pass
+    
+    fn = None
+    # Only allow basic math operations on parameters
+    if expr and not expr.translate(_STRIP_ALLOWED):
+        rewritten = _PARAM_RE.sub(r'_p\1', expr)
+        try:
+            fn = _expression_closure(ast.parse(rewritten, mode='eval').body, param_count)
+        except (SyntaxError, ValueError):
+            pass
+    _EXPR_CACHE[key] = fn
+    return fn
+
+@lru_cache(maxsize=512)
+def _parse_macro_parameters(params_str):
+    """Comma-separated macro parameters as a tuple of floats and expression strings.
+    Memoized, since footprint libraries repeat the same parameter strings."""
+    if not params_str:
+        return ()
+    
+    params = []
+    # Split by commas but handle expressions - these stay as text for evaluation
+    parts = params_str.decode('ascii', 'replace').split(',')
+    for part in parts:
+        part = part.strip()
+        try:
+            # Try to parse as float first
+            params.append(float(part))
+        except ValueError:
+            # Otherwise keep as string (could be an expression like '$1+$1')
+            params.append(part)
+    return tuple(params)
+
+def _compile_macro_expression(expr):
+    """Compile a macro parameter expression like '$1+$1' or '270.000000' once.
+    
+    Constants become floats. Anything else becomes a closure in which $N
+    reads p[N-1], evaluated against the aperture parameters at render time.
+    """
+    expr = expr.strip()
+    try:
+        return float(expr)
+    except ValueError:
+        pass
+    
+    fn = _macro_expression(expr)
+    return 0.0 if fn is None else fn
+
+def _build_master_regex(patterns, commands):
+    """Join the command patterns into one alternation, each wrapped in a named group"""
+    return re.compile(b'|'.join(
+        b'(?P<%s>%s)' % (name.encode('ascii'), patterns[key].pattern)
+        for name, key, _ in commands))
+
+def _build_scan_regex(patterns, master):
+    """Whole-file tokenizer: at each line start, skip leading blanks and try a
+    run of plain coordinate lines, then the master alternatives; any other
+    non-blank line is captured stripped as _line. Blank lines produce no match,
+    and text after a command up to the newline is skipped because every match
+    must start at the beginning of a line."""
+    return re.compile(rb'^[ \t\r\f\v]*(?:(?P<coordinate_block>' +
+                      patterns['coordinate_block'].pattern + rb')|' + master.pattern +
+                      rb'|(?P<_line>\S(?:[^\n]*\S)?))', re.MULTILINE)
+
+def _line_at(content, pos):
+    """The stripped line of content starting at pos"""
+    end = content.find(b'\n', pos)
+    if end < 0:
+        end = len(content)
+    return content[pos:end].strip()
+
+def _arc_bezier(cx, cy, r, a0, sweep, eps):
+    """Cubic Bezier pieces for the arc of radius r around (cx, cy) from angle a0
+    through sweep (radians), as (x1, y1, x2, y2, x3, y3) curveTo arguments.
+    Pieces are sized so the radial error (about r*2/27*(theta/4)**6) stays
+    within eps, and never span more than 90 degrees."""
+    theta_max = min(math.pi / 2, 4 * (13.5 * eps / r) ** (1 / 6))
+    # (less a hair, so a sweep of exactly 3 quarters isn't split in 4 by rounding)
+    num_pieces = max(1, int(math.ceil(abs(sweep) / theta_max - 1e-9)))
+    step = sweep / num_pieces
+    k = 4 / 3 * math.tan(step / 4) * r
+    # Trig only for the start and the step; each boundary is the previous one
+    # rotated by step
+    cos0, sin0 = _OCTANT_TRIG.get(a0) or (math.cos(a0), math.sin(a0))
+    cos_step, sin_step = _OCTANT_TRIG.get(step) or (math.cos(step), math.sin(step))
+    pieces = []
+    for _ in range(num_pieces):
+        cos1 = cos0 * cos_step - sin0 * sin_step
+        sin1 = sin0 * cos_step + cos0 * sin_step
+        x3 = cx + r * cos1
+        y3 = cy + r * sin1
+        pieces.append((cx + r * cos0 - k * sin0, cy + r * sin0 + k * cos0,
+                       x3 + k * sin1, y3 - k * cos1, x3, y3))
+        cos0, sin0 = cos1, sin1
+    return pieces
+
+def _arc_bounds(x1, y1, x2, y2, cx, cy, r, a0, a1):
+    """Bounding box (x_lo, y_lo, x_hi, y_hi) of the arc from (x1, y1) at angle a0
+    to (x2, y2) at angle a1 around (cx, cy): its end points, plus the extreme point
+    of each axis direction (0, 90, 180, 270 degrees) that the sweep passes through"""
+    lo = min(a0, a1)
+    span = abs(a1 - a0)
+    turn = 2 * math.pi
+    return (min(x1, x2, cx - r) if (math.pi - lo) % turn <= span else min(x1, x2),
+            min(y1, y2, cy - r) if (1.5 * math.pi - lo) % turn <= span else min(y1, y2),
+            max(x1, x2, cx + r) if -lo % turn <= span else max(x1, x2),
+            max(y1, y2, cy + r) if (0.5 * math.pi - lo) % turn <= span else max(y1, y2))
+
 
 class GerberAperture:
     """Represents a Gerber aperture (tool definition)"""
-    def __init__(self, aperture_id, shape, params, macro_name=None):
+    def __init__(self, aperture_id, shape, params, macro_name=None, macro=None):
         self.id = aperture_id
         self.shape = shape  # 'C' for circle, 'R' for rectangle, 'MACRO' for macro
         self.params = params  # list of dimensions
         self.macro_name = macro_name  # for macro apertures
-        
+        self._resolved = None  # cached macro geometry, resolved on first flash
+        
+        # Half-size of the aperture, added around every point drawn with it
+        if shape == 'C':
+            self.margin = params[0] / 2
+        elif shape == 'R':
+            self.margin = max(params[:2]) / 2
+        elif shape == 'MACRO':
+            # Measured from the macro's resolved primitives when the definition is
+            # known, otherwise a reasonable default
+            self.margin = macro.extent(params) if macro else 1.0  # 1mm default margin
+        else:
+            self.margin = 0
+        
+    def add_flash(self, path, x, y):
+        """Add a standard (C or R) flash at the given coordinates to a fill path"""
+        if self.shape == 'C':
+            path.circle(x, y, self.margin)  # margin is the radius
+        else:
+            w, h = self.params[0], self.params[1]
+            path.rect(x - w/2, y - h/2, w, h)
+    
     def draw_flash(self, canvas, x, y, parser=None):
         """Draw this aperture as a flash at the given coordinates"""
         if self.shape == 'C':  # Circle
@@ -27,10 +223,13 @@ class GerberAperture:
             w, h = self.params[0], self.params[1]
             canvas.rect(x - w/2, y - h/2, w, h, stroke=0, fill=1)
         elif self.shape == 'MACRO' and parser:  # Macro aperture
-            # Look up the macro definition and render it
-            if self.macro_name in parser.aperture_macros:
+            # Look up the macro definition once and reuse its resolved geometry
+            if self._resolved is None:
+                if self.macro_name not in parser.aperture_macros:
+                    return
                 macro = parser.aperture_macros[self.macro_name]
-                macro.render(canvas, x, y, self.params)
+                self._resolved = macro.get_resolved(self.params)
+            ApertureMacro.draw_shapes(canvas, x, y, self._resolved)
 
 class MacroPrimitive:
     """Represents a primitive within an aperture macro"""
@@ -38,28 +237,49 @@ class MacroPrimitive:
         self.type = primitive_type
         self.params = params
     
-    def render(self, canvas, x_offset, y_offset, macro_params):
-        """Render this primitive with given parameters"""
-        # Substitute macro parameters ($1, $2, etc.) with actual values
+    def compile_params(self):
+        """Pre-compile string parameters; returns the highest $N referenced"""
+        highest = 0
+        for i, param in enumerate(self.params):
+            if isinstance(param, str):
+                for num in _PARAM_RE.findall(param):
+                    highest = max(highest, int(num))
+                self.params[i] = _compile_macro_expression(param)
+        return highest
+    
+    def resolve_params(self, macro_params):
+        """Substitute macro parameters ($1, $2, etc.) with actual values"""
         resolved_params = []
         for param in self.params:
-            if isinstance(param, str):
+            if isinstance(param, float):
+                resolved_params.append(param)
+            elif isinstance(param, str):
                 # Handle expressions like '$1+$1', '$2', '270.000000'
                 resolved_value = self.evaluate_macro_expression(param, macro_params)
                 resolved_params.append(resolved_value)
             else:
-                resolved_params.append(param)
+                # Expression pre-compiled by compile_params()
+                try:
+                    resolved_params.append(float(param(macro_params)))
+                except Exception:
+                    resolved_params.append(0.0)
+        return resolved_params
+    
+    def resolve(self, macro_params):
+        """Resolve this primitive to geometry relative to the flash position.
+        
+        Returns ('C', dx, dy, radius), ('P', [(dx, dy), ...]) or
+        ('L', x0, y0, x1, y1, width), or None if nothing is drawn.
+        """
+        resolved_params = self.resolve_params(macro_params)
         
         if self.type == 1:  # Circle
             # Format: 1,exposure,diameter,x,y[,rotation]
             if len(resolved_params) >= 4:
                 exposure = resolved_params[0]
                 diameter = resolved_params[1]
-                x = resolved_params[2] + x_offset
-                y = resolved_params[3] + y_offset
                 if exposure > 0:  # Only draw if exposure is positive
-                    radius = diameter / 2
-                    canvas.circle(x, y, radius, stroke=0, fill=1)
+                    return ('C', resolved_params[2], resolved_params[3], diameter / 2)
         
         elif self.type == 4:  # Outline/Polygon
             # Format: 4,exposure,num_points,x1,y1,x2,y2,...,xn,yn[,rotation]
@@ -68,35 +288,26 @@ class MacroPrimitive:
                 num_points = int(resolved_params[1])
                 if exposure > 0 and len(resolved_params) >= 2 + num_points * 2:
                     # Extract coordinate pairs
-                    coords = []
-                    for i in range(num_points):
-                        x = resolved_params[2 + i * 2] + x_offset
-                        y = resolved_params[3 + i * 2] + y_offset
-                        coords.extend([x, y])
-                    
-                    # Draw polygon using reportlab
-                    if len(coords) >= 6:  # At least 3 points
-                        path = canvas.beginPath()
-                        path.moveTo(coords[0], coords[1])
-                        for i in range(2, len(coords), 2):
-                            path.lineTo(coords[i], coords[i+1])
-                        path.close()
-                        canvas.drawPath(path, stroke=0, fill=1)
+                    points = [(resolved_params[2 + i * 2], resolved_params[3 + i * 2])
+                              for i in range(num_points)]
+                    if len(points) >= 3:  # At least 3 points
+                        return ('P', points)
         
         elif self.type == 20:  # Vector line/Rectangle
             # Format: 20,exposure,width,start_x,start_y,end_x,end_y[,rotation]
             if len(resolved_params) >= 6:
                 exposure = resolved_params[0]
-                width = resolved_params[1]
-                start_x = resolved_params[2] + x_offset
-                start_y = resolved_params[3] + y_offset
-                end_x = resolved_params[4] + x_offset
-                end_y = resolved_params[5] + y_offset
-                
                 if exposure > 0:
-                    # Draw as a rectangle between the two points
-                    canvas.setLineWidth(width)
-                    canvas.line(start_x, start_y, end_x, end_y)
+                    return ('L', resolved_params[2], resolved_params[3],
+                            resolved_params[4], resolved_params[5], resolved_params[1])
+        
+        return None
+    
+    def render(self, canvas, x_offset, y_offset, macro_params):
+        """Render this primitive with given parameters"""
+        shape = self.resolve(macro_params)
+        if shape:
+            ApertureMacro.draw_shapes(canvas, x_offset, y_offset, [shape])
     
     def evaluate_macro_expression(self, expr, macro_params):
         """Evaluate a macro parameter expression like '$1+$1' or '270.000000'"""
@@ -111,30 +322,13 @@ class MacroPrimitive:
         except ValueError:
             pass
         
-        # Handle expressions with $ parameters
-        result = expr
-        
-        # Replace $1, $2, etc. with actual parameter values
-        import re
-        def replace_param(match):
-            param_num = int(match.group(1))
-            if param_num <= len(macro_params):
-                return str(macro_params[param_num - 1])
-            else:
-                return '0'  # Default value for missing parameters
-        
-        result = re.sub(r'\$(\d+)', replace_param, result)
-        
-        # Now evaluate the mathematical expression
+        # Handle expressions with $ parameters - missing parameters read as 0
+        fn = _macro_expression(expr, len(macro_params))
+        if fn is None:
+            return 0.0
         try:
-            # Simple evaluation - be careful about security
-            # Only allow basic math operations
-            allowed_chars = set('0123456789+-*/.() ')
-            if all(c in allowed_chars for c in result):
-                return float(eval(result))
-            else:
-                return 0.0
-        except:
+            return float(fn(macro_params))
+        except Exception:
             return 0.0
 
 class ApertureMacro:
@@ -142,45 +336,127 @@ class ApertureMacro:
     def __init__(self, name):
         self.name = name
         self.primitives = []
+        self.param_count = 0  # highest $N referenced by any primitive
+        self._resolved = {}  # tuple(params) -> resolved geometry
     
     def add_primitive(self, primitive):
+        self.param_count = max(self.param_count, primitive.compile_params())
         self.primitives.append(primitive)
+        self._resolved.clear()
+    
+    def get_resolved(self, params):
+        """Resolve all primitives for the given parameters, memoized per parameter set"""
+        key = tuple(params)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            if len(params) < self.param_count:
+                # Missing parameters evaluate as 0
+                params = list(params) + [0.0] * (self.param_count - len(params))
+            resolved = []
+            for primitive in self.primitives:
+                shape = primitive.resolve(params)
+                if shape:
+                    resolved.append(shape)
+            self._resolved[key] = resolved
+        return resolved
+    
+    def extent(self, params):
+        """Largest offset from the flash position, along either axis, covered by
+        the geometry for the given parameters (1.0 if nothing is drawn)"""
+        extent = None
+        for shape in self.get_resolved(params):
+            kind = shape[0]
+            if kind == 'C':
+                reach = max(abs(shape[1]), abs(shape[2])) + shape[3]
+            elif kind == 'P':
+                reach = max(max(abs(px), abs(py)) for px, py in shape[1])
+            else:
+                reach = max(abs(shape[1]), abs(shape[2]), abs(shape[3]), abs(shape[4])) + shape[5] / 2
+            if extent is None or reach > extent:
+                extent = reach
+        return 1.0 if extent is None else extent
+    
+    @staticmethod
+    def draw_shapes(canvas, x, y, shapes):
+        """Draw resolved macro geometry translated to (x, y)"""
+        for shape in shapes:
+            kind = shape[0]
+            if kind == 'C':
+                canvas.circle(x + shape[1], y + shape[2], shape[3], stroke=0, fill=1)
+            elif kind == 'P':
+                points = shape[1]
+                path = canvas.beginPath()
+                path.moveTo(points[0][0] + x, points[0][1] + y)
+                for dx, dy in points[1:]:
+                    path.lineTo(dx + x, dy + y)
+                path.close()
+                canvas.drawPath(path, stroke=0, fill=1)
+            elif kind == 'L':
+                # Draw as a line of the given width between the two points
+                canvas.setLineWidth(shape[5])
+                canvas.line(shape[1] + x, shape[2] + y, shape[3] + x, shape[4] + y)
     
     def render(self, canvas, x, y, params):
         """Render this macro at the given position with parameters"""
-        for primitive in self.primitives:
-            primitive.render(canvas, x, y, params)
+        self.draw_shapes(canvas, x, y, self.get_resolved(params))
 
 class GerberExtents:
-    """Track the extents of the Gerber drawing"""
+    """Track the extents of the Gerber drawing.
+    
+    Points are appended column-wise to x and y float arrays. All points in a batch
+    share one aperture margin, and a different margin starts a new batch, so
+    finalize_batch folds a batch into the running xmin/ymin/xmax/ymax with one
+    min/max per column.
+    """
     def __init__(self):
         self.reset()
     
     def reset(self):
         self.xmin = float('inf')
-        self.ymin = float('inf') 
+        self.ymin = float('inf')
         self.xmax = float('-inf')
         self.ymax = float('-inf')
+        self._xs = array('d')
+        self._ys = array('d')
+        self._margin = 0
     
     def update(self, x, y, aperture=None):
-        # Add some margin for aperture size
-        margin = 0
-        if aperture:
-            if aperture.shape == 'C':
-                margin = aperture.params[0] / 2
-            elif aperture.shape == 'R':
-                margin = max(aperture.params[0], aperture.params[1]) / 2
-            elif aperture.shape == 'MACRO':
-                # For macro apertures, use a reasonable default margin
-                # Could be improved by analyzing the macro definition
-                margin = 1.0  # 1mm default margin for macro apertures
-            
-        self.xmin = min(self.xmin, x - margin)
-        self.ymin = min(self.ymin, y - margin)
-        self.xmax = max(self.xmax, x + margin)
-        self.ymax = max(self.ymax, y + margin)
+        # Add some margin for aperture size (anything with a .margin, e.g. drill tools)
+        margin = aperture.margin if aperture else 0
+        if margin != self._margin:
+            self.finalize_batch()
+            self._margin = margin
+        self._xs.append(x)
+        self._ys.append(y)
+    
+    def update_bbox(self, x1, y1, x2, y2, aperture=None):
+        """Extend the extents by the box with opposite corners (x1, y1) and (x2, y2),
+        in either order, plus the aperture margin"""
+        margin = aperture.margin if aperture else 0
+        if margin != self._margin:
+            self.finalize_batch()
+            self._margin = margin
+        xs = self._xs
+        ys = self._ys
+        xs.append(x1)
+        xs.append(x2)
+        ys.append(y1)
+        ys.append(y2)
+    
+    def finalize_batch(self):
+        """Fold the buffered points into the running bounds and empty the buffers"""
+        xs = self._xs
+        if xs:
+            ys = self._ys
+            margin = self._margin
+            self.xmin = min(self.xmin, min(xs) - margin)
+            self.ymin = min(self.ymin, min(ys) - margin)
+            self.xmax = max(self.xmax, max(xs) + margin)
+            self.ymax = max(self.ymax, max(ys) + margin)
+            del xs[:], ys[:]
     
     def get_bounds(self):
+        self.finalize_batch()
         return (self.xmin, self.ymin, self.xmax, self.ymax)
 
 class DrillTool:
@@ -188,6 +464,7 @@ class DrillTool:
     def __init__(self, tool_number, diameter):
         self.number = tool_number
         self.diameter = diameter  # in current units
+        self.margin = diameter / 2  # extents margin around each hole
         
     def drill_hole(self, canvas, x, y):
         """Draw a drill hole at the given coordinates"""
@@ -201,6 +478,20 @@ class DrillTool:
 class DrillFileParser:
     """Parser for Excellon drill files (.drl)"""
     
+    # Regex patterns for drill commands - compiled once per process, shared by all instances
+    _PATTERNS = {
+        'tool_def': re.compile(r'T(\d+)C([0-9.]+)'),
+        'tool_select': re.compile(r'^T(\d+)$'),
+        'coordinate': re.compile(r'X([+-]?[0-9.]+)Y([+-]?[0-9.]+)'),
+        'units': re.compile(r'^(INCH|METRIC)$'),
+        'format': re.compile(r'FORMAT=\{.*\}'),
+        'header_start': re.compile(r'^M48$'),
+        'header_end': re.compile(r'^%$'),
+        'program_end': re.compile(r'^M30$'),
+        'comment': re.compile(r'^;.*'),
+        'attribute': re.compile(r'^; #@!.*'),
+    }
+
     def __init__(self, canvas=None, verbose=False):
         self.canvas = canvas
         self.verbose = verbose
@@ -209,20 +500,6 @@ class DrillFileParser:
         self.extents = GerberExtents()
         self.unit_scale = inch  # Default to inches for drill files
         self.holes = []  # Store all holes for rendering
-        
-        # Regex patterns for drill commands
-        self.patterns = {
-            'tool_def': re.compile(r'T(\d+)C([0-9.]+)'),
-            'tool_select': re.compile(r'^T(\d+)$'),
-            'coordinate': re.compile(r'X([+-]?[0-9.]+)Y([+-]?[0-9.]+)'),
-            'units': re.compile(r'^(INCH|METRIC)$'),
-            'format': re.compile(r'FORMAT=\{.*\}'),
-            'header_start': re.compile(r'^M48$'),
-            'header_end': re.compile(r'^%$'),
-            'program_end': re.compile(r'^M30$'),
-            'comment': re.compile(r'^;.*'),
-            'attribute': re.compile(r'^; #@!.*'),
-        }
     
     def process_file(self, filename):
         """Process a drill file"""
@@ -251,11 +528,11 @@ class DrillFileParser:
                 self._process_line(line, in_header)
                 
                 # Track header state
-                if self.patterns['header_start'].match(line):
+                if self._PATTERNS['header_start'].match(line):
                     in_header = True
-                elif self.patterns['header_end'].match(line):
+                elif self._PATTERNS['header_end'].match(line):
                     in_header = False
-                elif self.patterns['program_end'].match(line):
+                elif self._PATTERNS['program_end'].match(line):
                     break
                     
             except Exception as e:
@@ -274,11 +551,11 @@ class DrillFileParser:
         """Process a single line of drill code"""
         
         # Skip comments and attributes
-        if self.patterns['comment'].match(line) or self.patterns['attribute'].match(line):
+        if self._PATTERNS['comment'].match(line) or self._PATTERNS['attribute'].match(line):
             return
         
         # Check for units
-        match = self.patterns['units'].match(line)
+        match = self._PATTERNS['units'].match(line)
         if match:
             if match.group(1) == 'INCH':
                 self.unit_scale = inch
@@ -287,7 +564,7 @@ class DrillFileParser:
             return
         
         # Check for tool definition
-        match = self.patterns['tool_def'].match(line)
+        match = self._PATTERNS['tool_def'].match(line)
         if match:
             tool_number = int(match.group(1))
             diameter = float(match.group(2)) * self.unit_scale
@@ -297,14 +574,14 @@ class DrillFileParser:
             return
         
         # Check for tool selection
-        match = self.patterns['tool_select'].match(line)
+        match = self._PATTERNS['tool_select'].match(line)
         if match:
             tool_number = int(match.group(1))
             self.current_tool = self.tools.get(tool_number)
             return
         
         # Check for coordinate (drill command)
-        match = self.patterns['coordinate'].match(line)
+        match = self._PATTERNS['coordinate'].match(line)
         if match and self.current_tool:
             x = float(match.group(1)) * self.unit_scale
             y = float(match.group(2)) * self.unit_scale
@@ -313,17 +590,13 @@ class DrillFileParser:
             self.holes.append((x, y, self.current_tool))
             
             # Update extents
-            margin = self.current_tool.diameter / 2
-            self.extents.xmin = min(self.extents.xmin, x - margin)
-            self.extents.ymin = min(self.extents.ymin, y - margin)
-            self.extents.xmax = max(self.extents.xmax, x + margin)
-            self.extents.ymax = max(self.extents.ymax, y + margin)
+            self.extents.update(x, y, self.current_tool)
             
             return
         
         # Ignore other commands (FMAT, G90, G05, etc.)
-        if line in ['FMAT,2', 'G90', 'G05'] or self.patterns['format'].match(line) or \
-           self.patterns['header_start'].match(line) or self.patterns['header_end'].match(line):
+        if line in ['FMAT,2', 'G90', 'G05'] or self._PATTERNS['format'].match(line) or \
+           self._PATTERNS['header_start'].match(line) or self._PATTERNS['header_end'].match(line):
             return
     
     def render_holes(self):
@@ -337,6 +610,71 @@ class DrillFileParser:
 class ModernGerberParser:
     """Modern Gerber parser using regex instead of plex"""
     
+    # Regex patterns for Gerber commands - compiled once per process, shared by all instances
+    _PATTERNS = {
+        'format': re.compile(rb'%FSLAX(\d)(\d)Y(\d)(\d)\*%'),
+        'units': re.compile(rb'%MO(MM|IN)\*%'),
+        'aperture_def': re.compile(rb'%ADD(\d+)([^,*\n]+),?([^*\n]*)\*%'),  # Standard, macro and custom apertures
+        'aperture_select': re.compile(rb'D(\d+)\*'),
+        # X..Dnn*, X..Y..Dnn* and X..Y..I..J..Dnn* in one pattern, so the shared
+        # prefix is matched once without backtracking between alternatives
+        'coordinate': re.compile(rb'X(-?\d+)(?:Y(-?\d+)(?:I(-?\d+)J(-?\d+))?)?D(\d+)\*'),
+        # Runs of whole X..Y..D01/D02/D03* lines, split again into records
+        'coordinate_block': re.compile(
+            rb'X-?\d+Y-?\d+D0*[123]\*[ \t\r\f\v]*(?:\n|\Z)'
+            rb'(?:[ \t\r\f\v]*X-?\d+Y-?\d+D0*[123]\*[ \t\r\f\v]*(?:\n|\Z))*'),
+        'coordinate_record': re.compile(rb'X(-?\d+)Y(-?\d+)D0*([123])\*'),
+        'y_only': re.compile(rb'Y(-?\d+)D(\d+)\*'),
+        'g_command': re.compile(rb'G0*([123])\*?'),
+        'g74_g75': re.compile(rb'G(74|75)\*'),
+        'g36': re.compile(rb'G36\*'),  # Start region (filled polygon)
+        'g37': re.compile(rb'G37\*'),  # End region (filled polygon)
+        'aperture_macro_start': re.compile(rb'%AM([^*\n]+)\*$'),
+        'macro_primitive': re.compile(rb'^(\d+),(.+)\*?$'),
+        'macro_comment': re.compile(rb'^0 .*\*?$'),  # Aperture macro comment primitive
+        'attribute': re.compile(rb'%(TA|TO|TF|TD)([^*\n]*)\*%'),
+        'layer_polarity': re.compile(rb'%LP([CD])\*%'),
+        'end': re.compile(rb'M02\*'),
+    }
+    
+    # Line commands in priority order: (alternative name, _PATTERNS key, handler method).
+    # Named groups stop the regex engine from skipping alternatives by their
+    # first byte, so the coordinate lines that make up most files come first.
+    # G36/G37 must precede G0*([123]), which would also match them.
+    _LINE_COMMANDS = [
+        ('coordinate', 'coordinate', '_handle_coordinate'),
+        ('y_only', 'y_only', '_handle_y_only'),
+        ('aperture_select', 'aperture_select', '_handle_aperture_select'),
+        ('format', 'format', '_handle_format'),
+        ('units', 'units', '_handle_units'),
+        ('aperture_def', 'aperture_def', '_handle_aperture_def'),
+        ('macro_start', 'aperture_macro_start', '_handle_macro_start'),
+        ('attribute', 'attribute', '_handle_ignored'),
+        ('layer_polarity', 'layer_polarity', '_handle_ignored'),
+        ('region_start', 'g36', '_handle_region_start'),
+        ('region_end', 'g37', '_handle_region_end'),
+        ('interpolation', 'g_command', '_handle_interpolation_mode'),
+        ('quadrant_mode', 'g74_g75', '_handle_quadrant_mode'),
+        ('end', 'end', '_handle_ignored'),
+    ]
+    
+    # All line commands as one alternation, so a line costs a single regex call;
+    # the matched alternative is reported by match.lastgroup
+    _MASTER = _build_master_regex(_PATTERNS, _LINE_COMMANDS)
+    _SCAN = _build_scan_regex(_PATTERNS, _MASTER)
+    
+    # Upper bound on cached coordinate conversions
+    _COORD_CACHE_SIZE = 16384
+    
+    # Upper bound on distinct unrecognized commands kept for the verbose summary
+    _MAX_UNRECOGNIZED = 256
+    
+    # Alternatives that only exist in the scan regex: (alternative name, handler method)
+    _SCAN_COMMANDS = [
+        ('coordinate_block', '_handle_coordinate_block'),
+        ('_line', '_handle_line'),
+    ]
+
     def __init__(self, canvas=None, verbose=False):
         self.canvas = canvas
         self.verbose = verbose
@@ -348,12 +686,19 @@ class ModernGerberParser:
         self.extents = GerberExtents()
         self.format_spec = {'x_digits': 4, 'y_digits': 4, 'decimal_places': 6}
         self.unit_scale = mm  # Default to mm
+        self._coord_mul = mm / 1e6  # unit_scale / 10**decimal_places
+        # Coordinate token -> converted value. Grid-aligned boards repeat the same
+        # X/Y tokens, so this is mostly hits; cleared whenever _coord_mul changes
+        self._coord_cache = {}
         self.fg_color = colors.grey
         self.bg_color = colors.lightgrey
         
         # Interpolation mode: 1=linear, 2=clockwise arc, 3=counterclockwise arc
         self.interpolation_mode = 1
         
+        # Quadrant mode: G75 (multi quadrant) makes an arc ending at its start a full circle
+        self.multi_quadrant = False
+        
         # Arc center offset (I, J parameters)
         self.arc_center_i = 0
         self.arc_center_j = 0
@@ -371,30 +716,36 @@ class ModernGerberParser:
         self.in_region = False
         self.region_path = []
         
-        # Regex patterns for Gerber commands
-        self.patterns = {
-            'format': re.compile(r'%FSLAX(\d)(\d)Y(\d)(\d)\*%'),
-            'units': re.compile(r'%MO(MM|IN)\*%'),
-            'aperture_def': re.compile(r'%ADD(\d+)([CR]),([0-9.X]+)\*%'),
-            'macro_aperture_def': re.compile(r'%ADD(\d+)([^,*]+),?([^*]*)\*%'),  # For macro apertures
-            'aperture_select': re.compile(r'D(\d+)\*'),
-            'coordinate': re.compile(r'X(-?\d+)Y(-?\d+)D(\d+)\*'),
-            'coordinate_with_arc': re.compile(r'X(-?\d+)Y(-?\d+)I(-?\d+)J(-?\d+)D(\d+)\*'),
-            'x_only': re.compile(r'X(-?\d+)D(\d+)\*'),
-            'y_only': re.compile(r'Y(-?\d+)D(\d+)\*'),
-            'arc_params': re.compile(r'I(-?\d+)J(-?\d+)'),
-            'g_command': re.compile(r'G0*([123])\*?'),
-            'g74_g75': re.compile(r'G(74|75)\*'),
-            'g36': re.compile(r'G36\*'),  # Start region (filled polygon)
-            'g37': re.compile(r'G37\*'),  # End region (filled polygon)
-            'aperture_macro_start': re.compile(r'%AM([^*]+)\*$'),
-            'aperture_macro_end': re.compile(r'%$'),
-            'macro_primitive': re.compile(r'^(\d+),(.+)\*?$'),
-            'macro_comment': re.compile(r'^0 .*\*?$'),  # Aperture macro comment primitive
-            'attribute': re.compile(r'%(TA|TO|TF|TD)([^*]*)\*%'),
-            'layer_polarity': re.compile(r'%LP([CD])\*%'),
-            'comment': re.compile(r'G04.*\*'),
-            'end': re.compile(r'M02\*'),
+        # Consecutive flashes of one standard aperture, filled as a single path
+        self._flash_aperture = None
+        self._flash_path = None
+        
+        # Consecutive lines of one circular aperture, stroked as a single path
+        self._stroke_aperture = None
+        self._stroke_path = None
+        self._stroke_end = None
+        
+        # Line width and round caps/joins last set on the canvas (None/False: unknown)
+        self._line_width = None
+        self._line_round = False
+        
+        # Operation dispatch table indexed by D-code (D01, D02, D03)
+        self._ops = [None, self._op_interpolate, self._op_move, self._op_flash]
+        
+        # Alternative name -> (handler, index of the alternative's group), for the
+        # master regex on single lines and for the scan regex on whole files
+        self._group_handlers = self._bind_handlers(self._MASTER)
+        self._scan_handlers = self._bind_handlers(self._SCAN)
+        self._errors = []
+    
+    def _bind_handlers(self, regex):
+        """Map each alternative of regex to its bound handler and group index.
+        Handlers read their own sub-groups at fixed offsets from that index."""
+        commands = [(name, method) for name, _, method in self._LINE_COMMANDS]
+        return {
+            name: (getattr(self, method), regex.groupindex[name])
+            for name, method in commands + self._SCAN_COMMANDS
+            if name in regex.groupindex
         }
     
     def set_colors(self, fg_color, bg_color):
@@ -402,8 +753,11 @@ class ModernGerberParser:
         self.fg_color = fg_color
         self.bg_color = bg_color
         if self.canvas:
+            self._flush_pending()
             self.canvas.setFillColor(fg_color)
             self.canvas.setStrokeColor(fg_color)
+            # Other code may have drawn on the canvas since the last file
+            self._forget_line_state()
     
     def parse_macro_expression(self, expr_str):
         """Parse a macro parameter expression like '$1+$1' or '270.000000'"""
@@ -411,29 +765,24 @@ class ModernGerberParser:
         return expr_str.strip()
     
     def parse_macro_parameters(self, params_str):
-        """Parse comma-separated macro parameters"""
-        if not params_str:
-            return []
-        
-        params = []
-        # Split by commas but handle expressions
-        parts = params_str.split(',')
-        for part in parts:
-            part = part.strip()
-            try:
-                # Try to parse as float first
-                params.append(float(part))
-            except ValueError:
-                # Otherwise keep as string (could be an expression like '$1+$1')
-                params.append(part)
-        return params
+        """Parse comma-separated macro parameters (raw bytes from the file)"""
+        # A fresh list each call - macro primitives compile their params in place
+        return list(_parse_macro_parameters(params_str))
     
     def parse_coordinate(self, coord_str):
         """Parse coordinate string according to format specification"""
-        # Convert string to number with proper decimal placement
-        coord_int = int(coord_str)
-        # Assume format is implicit decimal places
-        return coord_int / (10 ** self.format_spec['decimal_places']) * self.unit_scale
+        # Implicit decimal places and unit scale are folded into _coord_mul
+        value = self._coord_cache.get(coord_str)
+        if value is None:
+            if len(self._coord_cache) >= self._COORD_CACHE_SIZE:
+                self._coord_cache.clear()
+            value = self._coord_cache[coord_str] = int(coord_str) * self._coord_mul
+        return value
+    
+    def _update_coord_mul(self):
+        """Recompute the coordinate multiplier after a format or unit change"""
+        self._coord_mul = self.unit_scale / (10 ** self.format_spec['decimal_places'])
+        self._coord_cache.clear()
     
     def process_file(self, filename):
         """Process a Gerber file"""
@@ -441,8 +790,12 @@ class ModernGerberParser:
             print(f"Processing Gerber file: {filename}")
         
         try:
-            with open(filename, 'r') as f:
-                content = f.read()
+            with open(filename, 'rb') as f:
+                # mmap refuses empty files, which have nothing to parse anyway
+                if os.fstat(f.fileno()).st_size:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    content = b''
         except FileNotFoundError:
             print(f"Warning: Gerber file {filename} not found - skipping")
             return self.extents.get_bounds()
@@ -450,20 +803,21 @@ class ModernGerberParser:
             print(f"Error reading {filename}: {e}")
             return self.extents.get_bounds()
         
-        # Split into lines and process each
-        lines = content.split('\n')
-        
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line:
-                continue
-                
-            try:
-                self._process_line(line)
-            except Exception as e:
-                print(f"Error processing line {line_num}: {line}")
-                print(f"Error: {e}")
-                continue
+        self._forget_line_state()
+        try:
+            self._scan(content)
+        finally:
+            if isinstance(content, mmap.mmap):
+                try:
+                    content.close()
+                except BufferError:
+                    # A scanner in an escaping traceback (e.g. Ctrl-C) still holds the
+                    # buffer; the mmap is released along with it instead
+                    pass
+            self._flush_pending()
+            if self.canvas:
+                # Strokes set round joins; leave the canvas with the default for the caller
+                self.canvas.setLineJoin(0)
         
         bounds = self.extents.get_bounds()
         if self.verbose:
@@ -475,12 +829,47 @@ class ModernGerberParser:
         
         return bounds
     
+    def _scan(self, content):
+        """Tokenize the whole file with the scan regex and dispatch each match.
+        
+        The try block sits outside the loop: on an error we record it and resume
+        the same iterator with the next line, so the hot loop carries no
+        exception handling. Macro definitions span several lines and keep their
+        own state, so while one is open lines go through the line-oriented path.
+        """
+        matches = self._SCAN.finditer(content)
+        handlers = self._scan_handlers
+        self._errors = errors = []
+        while True:
+            try:
+                for match in matches:
+                    if self.current_macro_name:
+                        self._process_macro_line(_line_at(content, match.start()))
+                        continue
+                    handler, base = handlers[match.lastgroup]
+                    if not handler(match, base):
+                        self._handle_unmatched(_line_at(content, match.start()))
+                break
+            except Exception as e:
+                # The message only, so the traceback doesn't keep parse frames alive
+                errors.append((match.start(), str(e)))
+        
+        # Errors are in file order, so count lines incrementally between them
+        line_num = 1
+        counted = 0
+        for pos, e in errors:
+            line_num += content[counted:pos].count(b'\n')
+            counted = pos
+            line = _line_at(content, pos)
+            print(f"Error processing line {line_num}: {line.decode('utf-8', 'replace')}")
+            print(f"Error: {e}")
+    
     def _print_verbose_summary(self):
         """Print summary of unrecognized/skipped commands in verbose mode"""
         if self.unrecognized_commands:
             print("\n--- Unrecognized Gerber commands ---")
             for cmd in sorted(self.unrecognized_commands):
-                print(f"  {cmd}")
+                print(f"  {cmd.decode('utf-8', 'replace')}")
         
         if self.skipped_commands:
             print("\n--- Skipped Gerber commands ---")
@@ -492,129 +881,227 @@ class ModernGerberParser:
     
     def _process_line(self, line):
         """Process a single line of Gerber code"""
-        
-        # Check for region start (G36) - filled polygon - PRIORITY CHECK
-        if line == 'G36*':
-            self.in_region = True
-            self.region_path = []
+        # Aperture macro definitions span several lines and keep their own state
+        if self.current_macro_name:
+            self._process_macro_line(line)
             return
+
+        # Cheap first-character dispatch for lines that never need the regexes
+        c0 = line[0]
         
-        # Check for region end (G37) - filled polygon - PRIORITY CHECK
-        if line == 'G37*':
-            if self.in_region and len(self.region_path) > 2:
-                self._draw_filled_polygon(self.region_path)
-            self.in_region = False
-            self.region_path = []
+        # G04 comments are ignored
+        if c0 == 71 and line.startswith(b'G04'):  # b'G'
             return
         
-        # Check for format specification
-        match = self.patterns['format'].match(line)
-        if match:
-            self.format_spec = {
-                'x_digits': int(match.group(1)) + int(match.group(2)),
-                'y_digits': int(match.group(3)) + int(match.group(4)),
-                'decimal_places': int(match.group(2))  # fractional digits
-            }
+        # Digit-led comma lines are polygon/macro primitive data that we
+        # intentionally don't render - drop them before any regex work
+        if 48 <= c0 <= 57 and b',' in line:  # b'0'-b'9'
             return
-        
-        # Check for units
-        match = self.patterns['units'].match(line)
+
+        # One match against the alternation of all line commands
+        match = self._MASTER.match(line)
         if match:
-            if match.group(1) == 'MM':
-                self.unit_scale = mm
-            else:
-                self.unit_scale = inch
-            return
+            handler, base = self._group_handlers[match.lastgroup]
+            if handler(match, base):
+                return
         
-        # Check for aperture definition
-        match = self.patterns['aperture_def'].match(line)
-        if match:
-            aperture_id = int(match.group(1))
-            shape = match.group(2)
-            params_str = match.group(3)
-            
+        self._handle_unmatched(line)
+    
+    def _handle_line(self, match, base=0):
+        """Any other line - the full line-oriented path"""
+        self._process_line(match.group(base))
+        return True
+    
+    def _handle_coordinate_block(self, match, base=0):
+        """A run of X..Y..D01/D02/D03* lines, parsed and dispatched in one loop"""
+        records = self._PATTERNS['coordinate_record'].finditer(
+            match.string, match.start(base), match.end(base))
+        ops = self._ops
+        mul = self._coord_mul
+        cache = self._coord_cache
+        if len(cache) >= self._COORD_CACHE_SIZE:
+            cache.clear()
+        cached = cache.get
+        # Resumable like the scan loop, so an error only skips its own line
+        while True:
+            try:
+                for record in records:
+                    x, y, operation = record.groups()
+                    fx = cached(x)
+                    if fx is None:
+                        fx = cache[x] = int(x) * mul
+                    fy = cached(y)
+                    if fy is None:
+                        fy = cache[y] = int(y) * mul
+                    ops[int(operation)](fx, fy)
+                return True
+            except Exception as e:
+                self._errors.append((record.start(), str(e)))
+    
+    def _handle_format(self, match, base=0):
+        """%FSLAX..Y..*% - coordinate format specification"""
+        self.format_spec = {
+            'x_digits': int(match.group(base + 1)) + int(match.group(base + 2)),
+            'y_digits': int(match.group(base + 3)) + int(match.group(base + 4)),
+            'decimal_places': int(match.group(base + 2))  # fractional digits
+        }
+        self._update_coord_mul()
+        return True
+    
+    def _handle_units(self, match, base=0):
+        """%MOMM*% / %MOIN*% - units"""
+        if match.group(base + 1) == b'MM':
+            self.unit_scale = mm
+        else:
+            self.unit_scale = inch
+        self._update_coord_mul()
+        return True
+    
+    def _handle_aperture_def(self, match, base=0):
+        """%ADD..*% - standard (C/R), macro-based and custom (RoundRect, FreePoly, ...) apertures"""
+        aperture_id = int(match.group(base + 1))
+        shape_name = match.group(base + 2).decode('ascii', 'replace')
+        params_str = match.group(base + 3)
+        
+        if shape_name == 'C' or shape_name == 'R':
             # Parse parameters
-            if 'X' in params_str:
-                params = [float(x) * self.unit_scale for x in params_str.split('X')]
+            if b'X' in params_str:
+                params = [float(x) * self.unit_scale for x in params_str.split(b'X')]
             else:
                 params = [float(params_str) * self.unit_scale]
             
-            self.apertures[aperture_id] = GerberAperture(aperture_id, shape, params)
-            return
-        
-        # Check for custom aperture definitions (RoundRect, etc.) - but first check if it's a macro aperture
-        if line.startswith('%ADD'):
-            # Try macro aperture definition first
-            match = self.patterns['macro_aperture_def'].match(line)
-            if match:
-                aperture_id = int(match.group(1))
-                macro_name = match.group(2)
-                params_str = match.group(3) if match.group(3) else ""
-                
-                # Check if this references a known macro
-                if macro_name in self.aperture_macros:
-                    # Parse macro parameters - split by X and convert to float
-                    params = []
-                    if params_str:
-                        # Split by X (common in macro parameters)
-                        param_parts = params_str.split('X')
-                        for part in param_parts:
-                            try:
-                                params.append(float(part) * self.unit_scale)
-                            except ValueError:
-                                pass
-                    self.apertures[aperture_id] = GerberAperture(aperture_id, 'MACRO', params, macro_name)
-                    return
-                
-                # Handle custom apertures (RoundRect, FreePoly, etc.)
-                if 'RoundRect' in macro_name or 'FreePoly' in macro_name:
-                    # Create fallback approximation as before
-                    if 'RoundRect' in macro_name:
-                        try:
-                            params = self.parse_macro_parameters(params_str)
-                            if len(params) >= 9:  # rounding radius + 4 corner coordinates
-                                # Use the coordinate extent to determine size
-                                x_coords = params[1::2]  # x coordinates
-                                y_coords = params[2::2]  # y coordinates
-                                width = max(x_coords) - min(x_coords)
-                                height = max(y_coords) - min(y_coords)
-                                # Create rectangular aperture as approximation
-                                self.apertures[aperture_id] = GerberAperture(aperture_id, 'R', [width, height])
-                            else:
-                                # Fallback to small circle
-                                default_size = 0.1 * self.unit_scale
-                                self.apertures[aperture_id] = GerberAperture(aperture_id, 'C', [default_size])
-                        except (ValueError, IndexError):
-                            default_size = 0.1 * self.unit_scale
-                            self.apertures[aperture_id] = GerberAperture(aperture_id, 'C', [default_size])
+            self.apertures[aperture_id] = GerberAperture(aperture_id, shape_name, params)
+            return True
+        
+        # Check if this references a known macro
+        if shape_name in self.aperture_macros:
+            # Parse macro parameters - split by X and convert to float
+            params = []
+            if params_str:
+                # Split by X (common in macro parameters)
+                param_parts = params_str.split(b'X')
+                for part in param_parts:
+                    try:
+                        params.append(float(part) * self.unit_scale)
+                    except ValueError:
+                        pass
+            self.apertures[aperture_id] = GerberAperture(aperture_id, 'MACRO', params, shape_name,
+                                                         self.aperture_macros[shape_name])
+            return True
+        
+        # Handle custom apertures (RoundRect, FreePoly, etc.)
+        is_round_rect = 'RoundRect' in shape_name
+        if is_round_rect or 'FreePoly' in shape_name:
+            # Create fallback approximation as before
+            if is_round_rect:
+                try:
+                    params = self.parse_macro_parameters(params_str)
+                    if len(params) >= 9:  # rounding radius + 4 corner coordinates
+                        # Use the coordinate extent to determine size
+                        x_coords = params[1::2]  # x coordinates
+                        y_coords = params[2::2]  # y coordinates
+                        width = max(x_coords) - min(x_coords)
+                        height = max(y_coords) - min(y_coords)
+                        # Create rectangular aperture as approximation
+                        self.apertures[aperture_id] = GerberAperture(aperture_id, 'R', [width, height])
                     else:
-                        # For FreePoly and other custom apertures, create aperture with fallback
-                        try:
-                            params = self.parse_macro_parameters(params_str)
-                            if params and isinstance(params[0], (int, float)) and params[0] > 0:
-                                default_size = params[0] * self.unit_scale
-                            else:
-                                default_size = 0.1 * self.unit_scale
-                        except (ValueError, IndexError):
-                            default_size = 0.1 * self.unit_scale
-                        
+                        # Fallback to small circle
+                        default_size = 0.1 * self.unit_scale
                         self.apertures[aperture_id] = GerberAperture(aperture_id, 'C', [default_size])
-                    return
-            
-            # If we get here, it might be a standard aperture definition that the macro pattern caught
-            # Fall through to standard aperture definition handling
+                except (ValueError, IndexError):
+                    default_size = 0.1 * self.unit_scale
+                    self.apertures[aperture_id] = GerberAperture(aperture_id, 'C', [default_size])
+            else:
+                # For FreePoly and other custom apertures, create aperture with fallback
+                try:
+                    params = self.parse_macro_parameters(params_str)
+                    if params and isinstance(params[0], (int, float)) and params[0] > 0:
+                        default_size = params[0] * self.unit_scale
+                    else:
+                        default_size = 0.1 * self.unit_scale
+                except (ValueError, IndexError):
+                    default_size = 0.1 * self.unit_scale
+                
+                self.apertures[aperture_id] = GerberAperture(aperture_id, 'C', [default_size])
+            return True
+        
+        # Unknown aperture type - not consumed, so it is reported as unrecognized
+        return False
+    
+    def _handle_macro_start(self, match, base=0):
+        """%AM<name>*% - start of an aperture macro definition"""
+        self.current_macro_name = match.group(base + 1).decode('ascii', 'replace')
+        self.current_macro_primitives = []
+        self.current_macro_primitive_line = None
+        return True
+    
+    def _handle_ignored(self, match, base=0):
+        """Attributes, layer polarity and M02 - metadata we don't act on"""
+        return True
+    
+    def _handle_aperture_select(self, match, base=0):
+        """Dnn* - select aperture"""
+        aperture_id = int(match.group(base + 1))
+        self.current_aperture = self.apertures.get(aperture_id)
+        return True
+    
+    def _handle_region_start(self, match, base=0):
+        """G36* - start of a filled polygon region"""
+        self.in_region = True
+        self.region_path = []
+        return True
+    
+    def _handle_region_end(self, match, base=0):
+        """G37* - end of a filled polygon region"""
+        if self.in_region and len(self.region_path) > 2:
+            self._draw_filled_polygon(self.region_path)
+        self.in_region = False
+        self.region_path = []
+        return True
+    
+    def _handle_interpolation_mode(self, match, base=0):
+        """G01/G02/G03 - linear, clockwise or counterclockwise interpolation"""
+        self.interpolation_mode = int(match.group(base + 1))
+        return True
+    
+    def _handle_quadrant_mode(self, match, base=0):
+        """G74/G75 - single or multi quadrant arcs"""
+        self.multi_quadrant = match.group(base + 1) == b'75'
+        return True
+    
+    def _handle_coordinate(self, match, base=0):
+        """X..Y..Dnn*, X..Y..I..J..Dnn* (arc center offset) or X..Dnn* (X only) -
+        told apart by which optional groups matched"""
+        x, y, i, j, operation = match.group(base + 1, base + 2, base + 3, base + 4, base + 5)
+        if i is not None:
+            mul = self._coord_mul
+            self._execute_arc_operation(int(x) * mul, int(y) * mul, int(i) * mul, int(j) * mul,
+                                        int(operation))
+        elif y is not None:
+            self._execute_operation(self.parse_coordinate(x), self.parse_coordinate(y),
+                                    int(operation))
+        else:
+            self._execute_operation(self.parse_coordinate(x), self.current_y, int(operation))
+        return True
+    
+    def _handle_y_only(self, match, base=0):
+        """Y..Dnn* - Y-only coordinate"""
+        y, operation = match.group(base + 1, base + 2)
+        self._execute_operation(self.current_x, self.parse_coordinate(y), int(operation))
+        return True
+    
+    def _process_macro_line(self, line):
+        """Process a line inside an aperture macro definition (%AM ... %)"""
+        patterns = self._PATTERNS
         
-        # Check for aperture macro start
-        match = self.patterns['aperture_macro_start'].match(line)
+        # A new aperture macro start replaces an unterminated definition
+        match = patterns['aperture_macro_start'].match(line)
         if match:
-            # Start of aperture macro definition
-            self.current_macro_name = match.group(1)
-            self.current_macro_primitives = []
-            self.current_macro_primitive_line = None
+            self._handle_macro_start(match)
             return
         
         # Check for aperture macro end
-        if line.strip() == '%' and self.current_macro_name:
+        if line == b'%':
             # End of aperture macro definition
             macro = ApertureMacro(self.current_macro_name)
             for primitive in self.current_macro_primitives:
@@ -622,96 +1109,72 @@ class ModernGerberParser:
             self.aperture_macros[self.current_macro_name] = macro
             self.current_macro_name = None
             self.current_macro_primitives = []
+            self.current_macro_primitive_line = None
             return
         
-        # Check if we're currently parsing a macro
-        if self.current_macro_name:
-            # Check for macro comment primitives (primitive 0)
-            match = self.patterns['macro_comment'].match(line)
-            if match:
-                # These are just comments within aperture macros - ignore silently
-                return
-            
-            # Check if we're continuing a multi-line primitive
-            if self.current_macro_primitive_line is not None:
-                # Append this line to the current primitive
-                self.current_macro_primitive_line += line
-                
-                # Check if this line ends the primitive (ends with % or *%)
-                if line.endswith('*%') or line.strip() == '%':
-                    # Process the complete primitive
-                    primitive_line = self.current_macro_primitive_line
-                    self.current_macro_primitive_line = None
-                    
-                    # Parse the complete primitive
-                    match = self.patterns['macro_primitive'].match(primitive_line)
-                    if match:
-                        primitive_type = int(match.group(1))
-                        params_str = match.group(2)
-                        
-                        # Check if this line ends the macro (ends with %)
-                        if params_str.endswith('%'):
-                            # Remove the % and process the primitive
-                            params_str = params_str[:-1]
-                            # Parse the parameters
-                            params = self.parse_macro_parameters(params_str)
-                            primitive = MacroPrimitive(primitive_type, params)
-                            self.current_macro_primitives.append(primitive)
-                            
-                            # End the macro
-                            macro = ApertureMacro(self.current_macro_name)
-                            for p in self.current_macro_primitives:
-                                macro.add_primitive(p)
-                            self.aperture_macros[self.current_macro_name] = macro
-                            self.current_macro_name = None
-                            self.current_macro_primitives = []
-                            return
-                        else:
-                            # Parse the parameters
-                            params = self.parse_macro_parameters(params_str)
-                            primitive = MacroPrimitive(primitive_type, params)
-                            self.current_macro_primitives.append(primitive)
-                            return
-                return
+        # Check for macro comment primitives (primitive 0)
+        match = patterns['macro_comment'].match(line)
+        if match:
+            # These are just comments within aperture macros - ignore silently
+            return
+        
+        # Check if we're continuing a multi-line primitive
+        if self.current_macro_primitive_line is not None:
+            # Append this line to the current primitive
+            self.current_macro_primitive_line += line
             
-            # Check for macro primitives
-            match = self.patterns['macro_primitive'].match(line)
-            if match:
-                primitive_type = int(match.group(1))
-                params_str = match.group(2)
+            # Check if this line ends the primitive (ends with % or *%)
+            if line.endswith(b'*%') or line == b'%':
+                # Process the complete primitive
+                primitive_line = self.current_macro_primitive_line
+                self.current_macro_primitive_line = None
                 
-                # Check if this line ends the macro (ends with %)
-                if params_str.endswith('%'):
-                    # Remove the % and process the primitive
-                    params_str = params_str[:-1]
-                    # Parse the parameters
-                    params = self.parse_macro_parameters(params_str)
-                    primitive = MacroPrimitive(primitive_type, params)
-                    self.current_macro_primitives.append(primitive)
+                # Parse the complete primitive
+                match = patterns['macro_primitive'].match(primitive_line)
+                if match:
+                    primitive_type = int(match.group(1))
+                    params_str = match.group(2)
                     
-                    # End the macro
-                    macro = ApertureMacro(self.current_macro_name)
-                    for p in self.current_macro_primitives:
-                        macro.add_primitive(p)
-                    self.aperture_macros[self.current_macro_name] = macro
-                    self.current_macro_name = None
-                    self.current_macro_primitives = []
-                    return
-                else:
-                    # Check if this line ends with *
-                    if line.endswith('*'):
-                        # Single-line primitive
+                    # Check if this line ends the macro (ends with %)
+                    if params_str.endswith(b'%'):
+                        # Remove the % and process the primitive
+                        params_str = params_str[:-1]
+                        # Parse the parameters
                         params = self.parse_macro_parameters(params_str)
                         primitive = MacroPrimitive(primitive_type, params)
                         self.current_macro_primitives.append(primitive)
+                        
+                        # End the macro
+                        macro = ApertureMacro(self.current_macro_name)
+                        for p in self.current_macro_primitives:
+                            macro.add_primitive(p)
+                        self.aperture_macros[self.current_macro_name] = macro
+                        self.current_macro_name = None
+                        self.current_macro_primitives = []
                         return
                     else:
-                        # Multi-line primitive - start accumulating
-                        self.current_macro_primitive_line = line
+                        # Parse the parameters
+                        params = self.parse_macro_parameters(params_str)
+                        primitive = MacroPrimitive(primitive_type, params)
+                        self.current_macro_primitives.append(primitive)
                         return
+            return
+        
+        # Check for macro primitives
+        match = patterns['macro_primitive'].match(line)
+        if match:
+            primitive_type = int(match.group(1))
+            params_str = match.group(2)
             
-            # Check for standalone macro end
-            if line.strip() == '%':
+            # Check if this line ends the macro (ends with %)
+            if params_str.endswith(b'%'):
+                # Remove the % and process the primitive
+                params_str = params_str[:-1]
+                # Parse the parameters
+                params = self.parse_macro_parameters(params_str)
+                primitive = MacroPrimitive(primitive_type, params)
+                self.current_macro_primitives.append(primitive)
+                
                 # End the macro
                 macro = ApertureMacro(self.current_macro_name)
                 for p in self.current_macro_primitives:
@@ -719,176 +1182,128 @@ class ModernGerberParser:
                 self.aperture_macros[self.current_macro_name] = macro
                 self.current_macro_name = None
                 self.current_macro_primitives = []
-                self.current_macro_primitive_line = None
                 return
-            
-            # Any other line inside a macro might be a continuation line
-            # If we don't have a current primitive line, this might be a malformed macro
-            return
-        
-        # Check for attributes and metadata
-        match = self.patterns['attribute'].match(line)
-        if match:
-            # These are just metadata - ignore silently
-            return
-        
-        # Check for layer polarity
-        match = self.patterns['layer_polarity'].match(line)
-        if match:
-            # This is just metadata - ignore silently
-            return
-        
-        # Check for aperture selection
-        match = self.patterns['aperture_select'].match(line)
-        if match:
-            aperture_id = int(match.group(1))
-            self.current_aperture = self.apertures.get(aperture_id)
-            return
-        
-        # Check for G commands (interpolation modes)
-        match = self.patterns['g_command'].match(line)
-        if match:
-            self.interpolation_mode = int(match.group(1))
-            return
-        
-        # Check for G74/G75 (quadrant mode - informational only)
-        match = self.patterns['g74_g75'].match(line)
-        if match:
-            # G74 = single quadrant mode, G75 = multi quadrant mode
-            # These affect how arc coordinates are interpreted
-            # For now, we'll just acknowledge them without changing behavior
-            return
-        
-        # Check for coordinate with arc parameters
-        match = self.patterns['coordinate_with_arc'].match(line)
-        if match:
-            x = self.parse_coordinate(match.group(1))
-            y = self.parse_coordinate(match.group(2))
-            i = self.parse_coordinate(match.group(3))
-            j = self.parse_coordinate(match.group(4))
-            operation = int(match.group(5))
-            
-            self._execute_arc_operation(x, y, i, j, operation)
-            return
-        
-        # Check for coordinate with operation
-        match = self.patterns['coordinate'].match(line)
-        if match:
-            x = self.parse_coordinate(match.group(1))
-            y = self.parse_coordinate(match.group(2))
-            operation = int(match.group(3))
-            
-            self._execute_operation(x, y, operation)
-            return
-        
-        # Check for X-only coordinate
-        match = self.patterns['x_only'].match(line)
-        if match:
-            x = self.parse_coordinate(match.group(1))
-            operation = int(match.group(2))
-            self._execute_operation(x, self.current_y, operation)
-            return
-        
-        # Check for Y-only coordinate  
-        match = self.patterns['y_only'].match(line)
-        if match:
-            y = self.parse_coordinate(match.group(1))
-            operation = int(match.group(2))
-            self._execute_operation(self.current_x, y, operation)
-            return
-        
-        # Ignore comments and other commands for now
-        if self.patterns['comment'].match(line) or self.patterns['end'].match(line):
-            return
+            else:
+                # Check if this line ends with *
+                if line.endswith(b'*'):
+                    # Single-line primitive
+                    params = self.parse_macro_parameters(params_str)
+                    primitive = MacroPrimitive(primitive_type, params)
+                    self.current_macro_primitives.append(primitive)
+                    return
+                else:
+                    # Multi-line primitive - start accumulating
+                    self.current_macro_primitive_line = line
+                    return
         
+        # Any other line inside a macro might be a continuation line
+        # If we don't have a current primitive line, this might be a malformed macro
+        return
+    
+    def _handle_unmatched(self, line):
+        """Handle a line no dispatch pattern consumed (lines arrive stripped)"""
         # Check for polygon coordinate sequences (filled areas)
-        if ',' in line and not line.startswith('%') and not line.startswith('G') and not line.startswith('D'):
-            # Check if this is an aperture macro primitive definition
-            match = self.patterns['macro_primitive'].match(line)
-            if match:
-                # This is an aperture macro primitive definition - ignore silently
-                return
-            
-            # This looks like polygon vertex data - these are complex filled areas that we intentionally don't render
-            # Don't show these as "skipped" since they're legitimate polygon data, just not rendered by our simple parser
-            return
-            
-        # Handle unrecognized parameter blocks
-        if line.startswith('%'):
-            # Unrecognized parameter block
-            if self.verbose and line not in self.unrecognized_commands:
-                self.unrecognized_commands.add(line)
-            return
-            
-        # Handle unrecognized D codes
-        elif line.startswith('D') and not self.patterns['aperture_select'].match(line):
-            # Unrecognized D code
-            if self.verbose and line not in self.unrecognized_commands:
-                self.unrecognized_commands.add(line)
-            return
-            
-        # Handle unrecognized G codes
-        elif line.startswith('G') and not self.patterns['g_command'].match(line):
-            # Unrecognized G code
-            if self.verbose and line not in self.unrecognized_commands:
-                self.unrecognized_commands.add(line)
-            return
-            
-        # Handle unrecognized M codes
-        elif line.startswith('M') and not self.patterns['end'].match(line):
-            # Unrecognized M code
-            if self.verbose and line not in self.unrecognized_commands:
-                self.unrecognized_commands.add(line)
+        if line[0] not in b'%GD' and b',' in line:
+            # Aperture macro primitive definitions and polygon vertex data - these are
+            # complex filled areas that we intentionally don't render. Don't show these
+            # as "skipped" since they're legitimate polygon data, just not rendered by
+            # our simple parser
             return
         
-        # Any other unrecognized command
-        if self.verbose and line not in self.unrecognized_commands:
+        # Unrecognized parameter blocks and D, G, M or other codes are all
+        # recorded the same way, for the verbose summary - bounded, so odd files
+        # can't grow the set without limit
+        if self.verbose and len(self.unrecognized_commands) < self._MAX_UNRECOGNIZED:
             self.unrecognized_commands.add(line)
     
     def _execute_operation(self, x, y, operation):
-        """Execute a drawing operation"""
-        
-        # If we're in a region (polygon), collect path points
-        if self.in_region:
-            if operation == 1:  # Move with draw - add line to region path
-                # Add line segment to region path
-                if not self.region_path:  # First point
-                    self.region_path.append((self.current_x, self.current_y))
-                self.region_path.append((x, y))
-            elif operation == 2:  # Move without draw - start new path segment
-                self.region_path.append((x, y))
-            # Update position and return - don't do normal drawing operations in regions
+        """Execute a drawing operation (D01 interpolate, D02 move, D03 flash)"""
+        if 0 < operation < 4:
+            self._ops[operation](x, y)
+        else:
+            # Not a valid operation code - just update position
             self.current_x = x
             self.current_y = y
+    
+    def _op_interpolate(self, x, y):
+        """D01: draw a line to (x, y), or add an edge to the current region"""
+        if self.in_region:
+            # Add line segment to region path
+            if not self.region_path:  # First point
+                self.region_path.append((self.current_x, self.current_y))
+            self.region_path.append((x, y))
             self.extents.update(x, y, self.current_aperture)
-            return
-        
-        # Normal operations (not in region)
-        if operation == 1:  # Move (interpolate) - draw line or arc
-            if self.canvas and self.current_aperture:
-                if self.interpolation_mode == 1:  # Linear interpolation
-                    self._draw_line(self.current_x, self.current_y, x, y)
-                else:  # Should not happen here - arcs handled separately
-                    self._draw_line(self.current_x, self.current_y, x, y)
+        elif self.canvas and self.current_aperture:
+            # Extends the extents by the whole stroke, end point included
+            self._draw_line(self.current_x, self.current_y, x, y)
+        else:
             self.extents.update(x, y, self.current_aperture)
-        
-        elif operation == 2:  # Move (without drawing)
-            pass  # Just update position
-        
-        elif operation == 3:  # Flash (place aperture)
-            if self.canvas and self.current_aperture:
-                self.current_aperture.draw_flash(self.canvas, x, y, self)
+        self.current_x = x
+        self.current_y = y
+    
+    def _op_move(self, x, y):
+        """D02: move without drawing, or start a new segment of the current region"""
+        if self.in_region:
+            self.region_path.append((x, y))
             self.extents.update(x, y, self.current_aperture)
-        
-        # Update current position
         self.current_x = x
         self.current_y = y
     
+    def _op_flash(self, x, y):
+        """D03: flash the current aperture at (x, y) - not drawn inside regions"""
+        aperture = self.current_aperture
+        if not self.in_region and self.canvas and aperture:
+            if aperture.shape == 'C' or aperture.shape == 'R':
+                if aperture is not self._flash_aperture:
+                    self._flush_pending()
+                    self._flash_aperture = aperture
+                    self._flash_path = self.canvas.beginPath()
+                aperture.add_flash(self._flash_path, x, y)
+            else:
+                self._flush_pending()
+                aperture.draw_flash(self.canvas, x, y, self)
+                # Macro line primitives set their own width
+                self._forget_line_state()
+        self.extents.update(x, y, aperture)
+        self.current_x = x
+        self.current_y = y
+    
+    def _flush_pending(self):
+        """Draw the pending flashes or lines. Called before anything else is drawn,
+        so the drawing order on the canvas is unchanged."""
+        if self._flash_path is not None:
+            # Non-zero winding, so overlapping flashes add up instead of cancelling
+            self.canvas.drawPath(self._flash_path, stroke=0, fill=1, fillMode=FILL_NON_ZERO)
+            self._flash_path = None
+            self._flash_aperture = None
+        elif self._stroke_path is not None:
+            # Round joins, as the round caps of separate lines overlapped
+            self._set_round_line(self._stroke_aperture.params[0])
+            self.canvas.drawPath(self._stroke_path, stroke=1, fill=0)
+            self._stroke_path = None
+            self._stroke_aperture = None
+            self._stroke_end = None
+    
+    def _set_round_line(self, width):
+        """Set the line width and round caps/joins, skipping what the canvas already has"""
+        if width != self._line_width:
+            self.canvas.setLineWidth(width)
+            self._line_width = width
+        if not self._line_round:
+            self.canvas.setLineCap(1)
+            self.canvas.setLineJoin(1)
+            self._line_round = True
+    
+    def _forget_line_state(self):
+        """Force the next stroke to set its line state, after code we don't track drew"""
+        self._line_width = None
+        self._line_round = False
+    
     def _execute_arc_operation(self, x, y, i, j, operation):
         """Execute an arc drawing operation"""
         if operation == 1 and self.canvas and self.current_aperture:  # Draw arc
+            # Extends the extents by the arc's bounding box, end point included
             self._draw_arc(self.current_x, self.current_y, x, y, i, j)
-            self.extents.update(x, y, self.current_aperture)
         
         # Update current position
         self.current_x = x
@@ -896,51 +1311,71 @@ class ModernGerberParser:
     
     def _draw_line(self, x1, y1, x2, y2):
         """Draw a line using the current aperture"""
-        if not self.current_aperture or not self.canvas:
+        aperture = self.current_aperture
+        canvas = self.canvas
+        if not aperture or not canvas:
             return
+        shape = aperture.shape
+        
+        if shape == 'C':
+            # For circular apertures, add the line to the pending stroke, continuing
+            # the current subpath when it starts where the previous line ended
+            if aperture is not self._stroke_aperture:
+                self._flush_pending()
+                self._stroke_aperture = aperture
+                self._stroke_path = canvas.beginPath()
+            if self._stroke_end != (x1, y1):
+                self._stroke_path.moveTo(x1, y1)
+            self._stroke_path.lineTo(x2, y2)
+            self._stroke_end = (x2, y2)
         
         # For rectangular apertures, draw as a filled rectangle along the path
-        if self.current_aperture.shape == 'R':
-            width = self.current_aperture.params[0]
+        elif shape == 'R':
+            self._flush_pending()
+            width = aperture.params[0]
             # Calculate line path and draw rectangle
             dx = x2 - x1
             dy = y2 - y1
-            length = math.sqrt(dx*dx + dy*dy)
             
-            if length > 0:
-                # Draw as rectangle along the line
-                self.canvas.saveState()
-                angle = math.atan2(dy, dx) * 180 / math.pi
-                center_x = (x1 + x2) / 2
-                center_y = (y1 + y2) / 2
-                self.canvas.translate(center_x, center_y)
-                self.canvas.rotate(angle)
-                self.canvas.rect(-length/2, -width/2, length, width, stroke=0, fill=1)
-                self.canvas.restoreState()
-        
-        elif self.current_aperture.shape == 'C':
-            # For circular apertures, draw as line with round caps
-            width = self.current_aperture.params[0]
-            self.canvas.setLineWidth(width)
-            self.canvas.setLineCap(1)  # Round caps for smoother appearance
-            self.canvas.line(x1, y1, x2, y2)
+            # Zero-length lines draw nothing; only diagonals need the square root
+            if dy == 0:
+                if dx != 0:
+                    # Horizontal: no rotation needed
+                    canvas.rect(min(x1, x2), y1 - width/2, abs(dx), width, stroke=0, fill=1)
+            elif dx == 0:
+                # Vertical: no rotation needed
+                canvas.rect(x1 - width/2, min(y1, y2), width, abs(dy), stroke=0, fill=1)
+            else:
+                # Fill the rotated rectangle from its corners: the end points offset by
+                # half the width along the line's normal (no atan2, no transform)
+                length = math.sqrt(dx*dx + dy*dy)
+                ox = width / 2 * dy / length
+                oy = width / 2 * dx / length
+                path = canvas.beginPath()
+                path.moveTo(x1 + ox, y1 - oy)
+                path.lineTo(x2 + ox, y2 - oy)
+                path.lineTo(x2 - ox, y2 + oy)
+                path.lineTo(x1 - ox, y1 + oy)
+                path.close()
+                canvas.drawPath(path, stroke=0, fill=1)
         
         # Update extents for the line
-        self.extents.update(x1, y1, self.current_aperture)
-        self.extents.update(x2, y2, self.current_aperture)
+        self.extents.update_bbox(x1, y1, x2, y2, aperture)
     
     def _draw_arc(self, x1, y1, x2, y2, i, j):
         """Draw a circular arc using the current aperture"""
-        if not self.current_aperture or not self.canvas:
+        aperture = self.current_aperture
+        canvas = self.canvas
+        if not aperture or not canvas:
             return
         
         # Calculate arc center
         center_x = x1 + i
         center_y = y1 + j
         
-        # Calculate start and end angles
-        start_angle = math.atan2(y1 - center_y, x1 - center_x) * 180 / math.pi
-        end_angle = math.atan2(y2 - center_y, x2 - center_x) * 180 / math.pi
+        # Calculate start and end angles, in radians throughout
+        start_angle = math.atan2(y1 - center_y, x1 - center_x)
+        end_angle = math.atan2(y2 - center_y, x2 - center_x)
         
         # Calculate radius
         radius = math.sqrt(i*i + j*j)
@@ -948,41 +1383,45 @@ class ModernGerberParser:
         # Determine sweep direction based on interpolation mode
         if self.interpolation_mode == 2:  # Clockwise (G02)
             if end_angle > start_angle:
-                end_angle -= 360
+                end_angle -= 2 * math.pi
         else:  # Counterclockwise (G03)
             if end_angle < start_angle:
-                end_angle += 360
-        
-        # For smooth arc rendering, approximate with multiple small line segments
-        num_segments = max(8, int(abs(end_angle - start_angle) / 5))  # 5 degrees per segment minimum
-        
-        if self.current_aperture.shape == 'C':
-            # For circular apertures, draw arc as connected line segments
-            width = self.current_aperture.params[0]
-            self.canvas.setLineWidth(width)
-            self.canvas.setLineCap(1)  # Round caps
-            
-            # Draw arc as series of connected line segments
-            prev_x, prev_y = x1, y1
-            for i in range(1, num_segments + 1):
-                angle = start_angle + (end_angle - start_angle) * i / num_segments
-                angle_rad = angle * math.pi / 180
-                curr_x = center_x + radius * math.cos(angle_rad)
-                curr_y = center_y + radius * math.sin(angle_rad)
-                
-                self.canvas.line(prev_x, prev_y, curr_x, curr_y)
-                prev_x, prev_y = curr_x, curr_y
+                end_angle += 2 * math.pi
+        if self.multi_quadrant and radius and x1 == x2 and y1 == y2:
+            # G75: an arc that ends where it starts is a full circle, unless it is a point
+            end_angle += -2 * math.pi if self.interpolation_mode == 2 else 2 * math.pi
+        sweep = end_angle - start_angle
+        
+        if aperture.shape == 'C' and (radius == 0 or abs(sweep) * radius < aperture.params[0] * 0.5):
+            # Arc shorter than half the aperture width (zero sweep or radius included):
+            # the chord is within a hair of it, so draw it as a line joining the pending
+            # stroke. This also keeps radius 0 out of _arc_bezier's piece count.
+            return self._draw_line(x1, y1, x2, y2)
+        self._flush_pending()
+        
+        if aperture.shape == 'C':
+            # For circular apertures, stroke the arc with the aperture diameter, in
+            # pieces accurate to half of it
+            width = aperture.params[0]
+            self._set_round_line(width)
+            path = canvas.beginPath()
+            path.moveTo(x1, y1)
+            curve_to = path.curveTo
+            for piece in _arc_bezier(center_x, center_y, radius, start_angle, sweep,
+                                     max(width * 0.5, 1e-4)):
+                curve_to(*piece)
+            canvas.drawPath(path, stroke=1, fill=0)
         
         # Update extents for the arc
-        self.extents.update(x1, y1, self.current_aperture)
-        self.extents.update(x2, y2, self.current_aperture)
-        self.extents.update(center_x - radius, center_y - radius, self.current_aperture)
-        self.extents.update(center_x + radius, center_y + radius, self.current_aperture)
+        x_lo, y_lo, x_hi, y_hi = _arc_bounds(x1, y1, x2, y2, center_x, center_y, radius,
+                                             start_angle, end_angle)
+        self.extents.update_bbox(x_lo, y_lo, x_hi, y_hi, aperture)
     
     def _draw_filled_polygon(self, path_points):
         """Draw a filled polygon from the collected region path points"""
         if not self.canvas or len(path_points) < 3:
             return
+        self._flush_pending()
         
         try:
             # Set fill color to the foreground color (should be visible copper color)
@@ -1024,11 +1463,20 @@ def ResetExtents():
 
 def UpdateExtents(x1, y1, x2, y2):
     """Update global extents (for compatibility)"""
-    global gerber_extents
-    gerber_extents[0] = min(gerber_extents[0], min(x1, x2))
-    gerber_extents[1] = min(gerber_extents[1], min(y1, y2))
-    gerber_extents[2] = max(gerber_extents[2], max(x1, x2))
-    gerber_extents[3] = max(gerber_extents[3], max(y1, y2))
+    # Plain comparisons rather than nested min()/max() calls
+    ext = gerber_extents
+    if x1 > x2:
+        x1, x2 = x2, x1
+    if y1 > y2:
+        y1, y2 = y2, y1
+    if x1 < ext[0]:
+        ext[0] = x1
+    if y1 < ext[1]:
+        ext[1] = y1
+    if x2 > ext[2]:
+        ext[2] = x2
+    if y2 > ext[3]:
+        ext[3] = y2
 
 # Compatibility class that mimics the original GerberMachine interface
 class GerberMachine: